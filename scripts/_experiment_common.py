@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+##
+# @file _experiment_common.py
+# @brief Helpers shared by the experiment driver scripts.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import re
+
+
+# Matches the run time values printed by the executable
+float_pattern = r'((?:(?:\d*\.\d+)|(?:\d+\.?))(?:[Ee][+-]?\d+)?)'
+
+
+def compile_runtime_pattern(actions):
+    '''
+    Compile the single pattern matching the run time line of any of
+    the given actions, so one scan of an output collects all of them.
+    '''
+    return re.compile('Time taken in (%s): %s' % ('|'.join(re.escape(action) for action in actions),
+                                                  float_pattern))
+
+
+def order_runtimes(found, actions, required):
+    '''
+    Order the collected run times and check for the required actions.
+
+    Actions which did not run default to zero, except the required
+    ones.
+    '''
+    for action in required:
+        if action not in found:
+            raise RuntimeError('Could not find the time taken in %s' % action)
+    return [found.get(action, 0.0) for action in actions]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+##
+# @file benchmark.py
+# @brief Script for benchmarking ramBLe on the simulated data sets.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import concurrent.futures
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from _experiment_common import compile_runtime_pattern
+
+
+# Dimensions (n, m) of the simulated data sets, keyed by name
+all_datasets = {
+    's1' : (100, 1000),
+    's2' : (1000, 10000),
+    's3' : (10000, 100000),
+}
+
+# The timed actions recorded by the benchmark, in the reported order
+_TIMED_ACTIONS = ('getting the network', 'G-square computations')
+
+# Matches the run times and the memory usage in the combined stdout
+# and time -v report; the time lines share their pattern with the
+# scalability driver
+_TIME_RE = compile_runtime_pattern(_TIMED_ACTIONS)
+_MEM_RE = re.compile(r'Maximum resident set size \(kbytes\):\s+(\d+)')
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Benchmark ramBLe on the simulated data sets')
+    parser.add_argument('-b', '--basedir', metavar='DIR', type=str, default='.',
+                        help='Base directory containing the data sets.')
+    parser.add_argument('-x', '--executable', metavar='FILE', type=str, default='./ramble',
+                        help='Path to the executable to be benchmarked.')
+    parser.add_argument('-d', '--datasets', metavar='NAME', type=str, nargs='+',
+                        default=list(all_datasets), help='Names of the data sets to be used.')
+    parser.add_argument('-g', '--directories', metavar='DIR', type=str, nargs='+',
+                        default=['0.1M', '1M', '10M'],
+                        help='Data set directories, one per generated size.')
+    parser.add_argument('-r', '--repeat', metavar='N', type=int, default=5,
+                        help='Number of times the experiments should be repeated.')
+    return parser.parse_args()
+
+
+def parse_results(output):
+    '''
+    Parse the run times and the memory usage from the benchmark output.
+    '''
+    found = dict((match.group(1), float(match.group(2))) for match in _TIME_RE.finditer(output))
+    memory = int(_MEM_RE.search(output).group(1))
+    return found['getting the network'], found['G-square computations'], memory
+
+
+def run_one(basedir, executable, d, s, n, m, r):
+    '''
+    Run a single benchmark repeat and return the parsed results.
+    '''
+    suffix = '%d_%s_%s_%d' % (os.getpid(), d, s, r)
+    outfile = os.path.join(tempfile.gettempdir(), 'ramble_benchmark_%s.out' % suffix)
+    timefile = os.path.join(tempfile.gettempdir(), 'ramble_benchmark_%s.time' % suffix)
+    argv = ['/usr/bin/time', '-o', timefile, '-v', executable, '-n', str(n), '-m', str(m),
+            '-f', '%s/data/%s/%s.csv' % (basedir, d, s), '-c', '-s', ' ', '-l']
+    with open(outfile, 'wb') as of:
+        subprocess.run(argv, stdout=of, stderr=subprocess.DEVNULL, check=True)
+    with open(outfile, 'r') as of, open(timefile, 'r') as tf:
+        output = of.read() + tf.read()
+    os.remove(outfile)
+    os.remove(timefile)
+    return parse_results(output)
+
+
+def run_experiments(basedir, executable, datasets, directories, repeat):
+    '''
+    Run the benchmarks for all the data sets and report the averages.
+
+    All the (directory, data set, repeat) runs are independent and are
+    dispatched to a pool sized so that the launched executables do not
+    oversubscribe the machine.
+    '''
+    threads = int(os.environ.get('OMP_NUM_THREADS', '1'))
+    workers = max(os.cpu_count() // threads, 1)
+    results = np.empty((len(directories), len(datasets), repeat, 3))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = dict()
+        for i, d in enumerate(directories):
+            for j, s in enumerate(datasets):
+                n, m = all_datasets[s]
+                for r in range(repeat):
+                    futures[(i, j, r)] = executor.submit(run_one, basedir, executable, d, s, n, m, r)
+        for (i, j, r), future in futures.items():
+            results[i, j, r] = future.result()
+    # Emit the per-config averages as a single CSV write; the rows are
+    # in directory-major order matching the submitted grid
+    means = results.mean(axis=2).reshape(-1, 3)
+    labels = np.array(['%s,%s' % (d, s) for d in directories for s in datasets])
+    sys.stdout.write('directory,dataset,network,gsquare,memory\n')
+    sys.stdout.flush()
+    np.savetxt(sys.stdout.buffer, np.column_stack([labels, np.char.mod('%.6f', means)]),
+               fmt='%s', delimiter=',')
+
+
+def main():
+    '''
+    Benchmark the executable on all the given data sets.
+    '''
+    args = parse_args()
+    run_experiments(args.basedir, args.executable, args.datasets, args.directories, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+##
+# @file compare.py
+# @brief Script for comparing two learned networks.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+from collections import namedtuple
+import re
+
+
+# Matches hyphens between word characters in variable names,
+# which pydot does not accept in unquoted identifiers; kept as a
+# bytes pattern so the rewrite runs on the raw buffer
+hyphens = re.compile(rb'(\w)-(\w)')
+
+# Matches the edge statements and the standalone node declarations
+# in a DOT file, for reading without a full pydot parse
+_EDGE_RE = re.compile(r'"?([\w.-]+)"?\s*(?:->|--)\s*"?([\w.-]+)"?')
+_NODE_RE = re.compile(r'^\s*"?([\w.-]+)"?\s*(?:\[[^\]]*\])?\s*;', re.M)
+
+# A network reduced to what compare() consumes
+Graph = namedtuple('Graph', ['nodes', 'edges', 'graph_type'])
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Compare two networks')
+    parser.add_argument('-f', '--first', metavar='FILE', type=str, required=True,
+                        help='Name of the first network file.')
+    parser.add_argument('-s', '--second', metavar='FILE', type=str, required=True,
+                        help='Name of the second network file.')
+    parser.add_argument('-t', '--format', metavar='FORMAT', type=str, default='dot',
+                        help='Format of the network files (dot or el).')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Print all the missing nodes and edges.')
+    return parser.parse_args()
+
+
+def read(name, file_format, simple=True):
+    '''
+    Read the network from the given file.
+
+    By default the network is reduced to its node and edge sets, which
+    is all compare() consumes and for DOT files skips building the
+    full attributed pydot graph by tokenizing just the edge statements
+    and node declarations. simple=False returns the pydot graph for
+    callers that need the attributes.
+    '''
+    if file_format == 'dot':
+        with open(name, 'rb') as f:
+            buf = f.read()
+        if simple:
+            graph_type = 'digraph' if b'digraph' in buf[:64] else 'graph'
+            # One decode of the buffer; findall then yields the node
+            # and edge strings directly with no per-match conversion
+            s = buf.decode('utf-8')
+            edges = set(_EDGE_RE.findall(s))
+            nodes = set(_NODE_RE.findall(s))
+            for source, destination in edges:
+                nodes.add(source)
+                nodes.add(destination)
+            return Graph(nodes, edges, graph_type)
+        # Only the full attributed parse needs pydot; keeping the
+        # import here spares every simple comparison its load time
+        import pydot
+        s = hyphens.sub(rb'\1.\2', buf).replace(b'"', b'').decode('utf-8')
+        return pydot.graph_from_dot_data(s)[0]
+    elif file_format == 'el':
+        nodes = set()
+        edges = set()
+        with open(name, 'r') as f:
+            for line in f:
+                source, destination = line.split()
+                nodes.add(source)
+                nodes.add(destination)
+                edges.add((source, destination))
+        return Graph(nodes, edges, 'digraph')
+    else:
+        raise RuntimeError('Unknown file format %s' % file_format)
+
+
+def compare(first, second, verbose):
+    '''
+    Compare the nodes and the edges of the two networks.
+
+    The networks arrive reduced to their node and edge sets, so the
+    comparison is a handful of hashed set operations instead of a
+    linear scan of the second network per node and edge.
+    '''
+    first_nodes = first.nodes
+    second_nodes = second.nodes
+    first_edges = first.edges
+    second_edges = second.edges
+    if first.graph_type == 'graph':
+        first_edges = set(frozenset(e) for e in first_edges)
+        second_edges = set(frozenset(e) for e in second_edges)
+    false_negatives = first_edges - second_edges
+    false_positives = second_edges - first_edges
+    if verbose:
+        for node in first_nodes - second_nodes:
+            print('Node %s does not appear in the second network' % node)
+        for node in second_nodes - first_nodes:
+            print('Node %s does not appear in the first network' % node)
+        for edge in false_negatives:
+            print('Edge %s is missing from the second network' % str(tuple(edge)))
+        for edge in false_positives:
+            print('Edge %s is missing from the first network' % str(tuple(edge)))
+    tp = len(first_edges) - len(false_negatives)
+    fn = len(false_negatives)
+    fp = len(false_positives)
+    print('TP = %d, FN = %d, FP = %d' % (tp, fn, fp))
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    print('Precision = %g, Recall = %g' % (precision, recall))
+
+
+def main():
+    '''
+    Read and compare the two networks.
+    '''
+    args = parse_args()
+    first = read(args.first, args.format)
+    second = read(args.second, args.format)
+    compare(first, second, args.verbose)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+##
+# @file compare_lemontree.py
+# @brief Script for comparing the outputs of two Lemon-Tree runs.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import concurrent.futures
+import gzip
+from itertools import repeat
+import hashlib
+import os
+import pickle
+import tempfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+try:
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# Tolerance used for comparing floating point scores
+TOLERANCE = 1e-6
+
+
+def open_gzip(filename):
+    '''
+    Open a gzipped file for reading, decompressing in parallel if possible.
+
+    Uses rapidgzip, when available, for block-parallel decompression;
+    a seek-point index saved by a previous read is imported so that
+    repeated comparisons of the same outputs skip the block-finder
+    warmup.
+    '''
+    if rapidgzip is None:
+        return gzip.open(filename, 'rb')
+    gf = rapidgzip.open(filename, parallelization=os.cpu_count())
+    indexfile = filename + '.index'
+    if os.path.exists(indexfile):
+        gf.import_index(indexfile)
+    return gf
+
+
+def save_gzip_index(gf, filename):
+    '''
+    Persist the seek-point index of a fully read gzipped file.
+
+    Exporting only after the read means the index comes out of the
+    pass that was needed anyway instead of forcing an extra one up
+    front, and the rename keeps an interrupted run from leaving a
+    truncated index to be imported next time.
+    '''
+    indexfile = filename + '.index'
+    if rapidgzip is None or os.path.exists(indexfile):
+        return
+    tmpfile = '%s.%d.tmp' % (indexfile, os.getpid())
+    gf.export_index(tmpfile)
+    os.replace(tmpfile, indexfile)
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Compare the outputs of two Lemon-Tree runs')
+    parser.add_argument('-f', '--first', metavar='DIR', type=str, required=True,
+                        help='Output directory of the first run.')
+    parser.add_argument('-s', '--second', metavar='DIR', type=str, required=True,
+                        help='Output directory of the second run.')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Print all the mismatches instead of stopping at the first one.')
+    return parser.parse_args()
+
+
+def read_cached(filename, build):
+    '''
+    Return the parsed form of the given file, caching it on disk.
+
+    The cache key includes the file's modification time so that a
+    stale entry is never returned; repeated comparisons of the same
+    outputs skip the parse entirely.
+    '''
+    key = '%s:%d' % (os.path.abspath(filename), os.stat(filename).st_mtime_ns)
+    cachefile = os.path.join(tempfile.gettempdir(), 'lemontree_' + hashlib.sha1(key.encode()).hexdigest() + '.pkl')
+    if os.path.exists(cachefile):
+        with open(cachefile, 'rb') as cf:
+            return pickle.load(cf)
+    result = build()
+    # The rename keeps an interrupted or concurrent dump from leaving
+    # a truncated pickle behind the unchanged cache key
+    tmpfile = '%s.%d.tmp' % (cachefile, os.getpid())
+    with open(tmpfile, 'wb') as cf:
+        pickle.dump(result, cf)
+    os.replace(tmpfile, cachefile)
+    return result
+
+
+def read_task_outputs(dirname):
+    '''
+    Read the task configurations recorded in the given output directory.
+    '''
+    with open(os.path.join(dirname, 'configs.json'), 'rb') as fc:
+        return json_loads(fc.read())
+
+
+def compare_configs(firstconfigs, secondconfigs):
+    '''
+    Compare the configurations with which two tasks were run.
+    '''
+    match = True
+    firstnames = firstconfigs.keys()
+    secondnames = secondconfigs.keys()
+    for name in (firstnames - secondnames) | (secondnames - firstnames):
+        print('Configuration %s does not appear in both the runs' % name)
+        match = False
+    for name in firstnames & secondnames:
+        if name != 'output_file' and firstconfigs[name] != secondconfigs[name]:
+            print('Configuration %s does not match across the runs (%s vs. %s)' % (name, firstconfigs[name], secondconfigs[name]))
+            match = False
+    return match
+
+
+def read_xml_events(filename):
+    '''
+    Digest a gzipped XML file into a flat list of streamed events.
+
+    Start events carry the element's tag and attributes and end events
+    are recorded as None; this is everything the comparison consumes,
+    and the digested list is cached on disk so that re-comparing the
+    same outputs skips the decompression and the parse.
+    '''
+    def build():
+        events = []
+        with open_gzip(filename) as gf:
+            for event, elem in ET.iterparse(gf, events=('start', 'end')):
+                if event == 'start':
+                    events.append((elem.tag, dict(elem.attrib)))
+                else:
+                    events.append(None)
+                    elem.clear()
+            save_gzip_index(gf, filename)
+        return events
+    return read_cached(filename, build)
+
+
+def compare_xml_elements(first, second, path):
+    '''
+    Compare the tags and the attributes of two streamed XML elements.
+    '''
+    firsttag, firstattrib = first
+    secondtag, secondattrib = second
+    match = True
+    if firsttag != secondtag:
+        print('Mismatching tags %s and %s found at %s' % (firsttag, secondtag, ' -> '.join(path)))
+        match = False
+    firstnames = firstattrib.keys()
+    secondnames = secondattrib.keys()
+    for name in (firstnames - secondnames) | (secondnames - firstnames):
+        print('Attribute %s at %s does not appear in both the runs' % (name, ' -> '.join(path)))
+        match = False
+    for name in firstnames & secondnames:
+        fval = firstattrib[name]
+        sval = secondattrib[name]
+        if fval != sval:
+            try:
+                mismatch = abs(float(fval) - float(sval)) >= TOLERANCE
+            except ValueError:
+                mismatch = True
+            if mismatch:
+                print('Attribute %s at %s does not match across the runs (%s vs. %s)' % (name, ' -> '.join(path), fval, sval))
+                match = False
+    return match
+
+
+def compare_xml_trees(firstfile, secondfile, verbose):
+    '''
+    Compare the module networks in two gzipped XML files.
+
+    Walks the digested event lists of both the files in lockstep, so
+    no ElementTree is ever materialized and cached digests from a
+    previous comparison are reused as is.
+    '''
+    fevents = read_xml_events(firstfile)
+    sevents = read_xml_events(secondfile)
+    match = True
+    if len(fevents) != len(sevents):
+        print('Files %s and %s do not contain the same number of elements' % (firstfile, secondfile))
+        if not verbose:
+            return False
+        match = False
+    path = []
+    for fevent, sevent in zip(fevents, sevents):
+        if (fevent is None) != (sevent is None):
+            print('Mismatching structures found at %s' % ' -> '.join(path))
+            return False
+        if fevent is None:
+            path.pop()
+            continue
+        path.append(fevent[0])
+        if not compare_xml_elements(fevent, sevent, path):
+            if not verbose:
+                return False
+            match = False
+    return match
+
+
+def compare_modules(firstfile, secondfile, verbose):
+    '''
+    Compare the module networks learned by two runs.
+    '''
+    return compare_xml_trees(firstfile + '.xml.gz', secondfile + '.xml.gz', verbose)
+
+
+def read_regulators(filename):
+    '''
+    Read the scored regulator-module assignments from the given file.
+    '''
+    return read_cached(filename, lambda:
+        pd.read_csv(filename, sep=r'\s+', header=None, names=['reg', 'module', 'score'],
+                    engine='c', dtype={'reg': 'string', 'module': 'string', 'score': 'float64'}))
+
+
+def compare_regulators(firstfile, secondfile, verbose):
+    '''
+    Compare the scored regulators assigned by two runs.
+    '''
+    match = True
+    for suffix in ('allreg', 'topreg', 'randomreg'):
+        first = read_regulators('%s.%s.txt' % (firstfile, suffix))
+        second = read_regulators('%s.%s.txt' % (secondfile, suffix))
+        merged = first.merge(second, on=['reg', 'module'], how='outer',
+                             indicator=True, suffixes=('_first', '_second'))
+        missing = merged['_merge'] != 'both'
+        for reg, module in zip(merged['reg'][missing], merged['module'][missing]):
+            print('Regulator %s for module %s does not appear in both the runs' % (reg, module))
+        mismatched = np.abs(merged['score_first'] - merged['score_second']).to_numpy() >= TOLERANCE
+        for reg, module in zip(merged['reg'][mismatched], merged['module'][mismatched]):
+            print('Score for regulator %s of module %s does not match across the runs' % (reg, module))
+        if missing.any() or mismatched.any():
+            match = False
+            if not verbose:
+                return False
+    return match
+
+
+def read_clusters(filename):
+    '''
+    Read the variable-to-cluster assignments as a sorted structured array.
+    '''
+    def build():
+        # ndmin keeps a single-line file a one-element array instead
+        # of a 0-d scalar, which cannot be sorted
+        clusters = np.loadtxt(filename, dtype=[('var', 'U64'), ('cluster', 'U64')], ndmin=1)
+        clusters.sort(order='var')
+        return clusters
+    return read_cached(filename, build)
+
+
+def compare_clusters(firstfile, secondfile, verbose):
+    '''
+    Compare the cluster assignments produced by two runs.
+
+    Both the assignments are sorted by variable, so the comparison is
+    a merge-join of two contiguous arrays; per-variable Python objects
+    are only created for the mismatching subset.
+    '''
+    first = read_clusters(firstfile)
+    second = read_clusters(secondfile)
+    common = np.intersect1d(first['var'], second['var'])
+    match = True
+    if common.shape[0] != first.shape[0] or common.shape[0] != second.shape[0]:
+        for var in first['var'][~np.isin(first['var'], common)]:
+            print('Variable %s does not appear in both the runs' % var)
+        for var in second['var'][~np.isin(second['var'], common)]:
+            print('Variable %s does not appear in both the runs' % var)
+        match = False
+    mismatched = first['cluster'][np.isin(first['var'], common)] != second['cluster'][np.isin(second['var'], common)]
+    for var in common[mismatched]:
+        print('Cluster for variable %s does not match across the runs' % var)
+    return match and not mismatched.any()
+
+
+def compare_ganesh(firstfile, secondfile, verbose):
+    '''
+    Compare the clusters from all the GaneSH runs of two executions.
+    '''
+    with open(firstfile, 'r') as ff:
+        firstruns = ff.read().split()
+    with open(secondfile, 'r') as sf:
+        secondruns = sf.read().split()
+    if len(firstruns) != len(secondruns):
+        print('Files %s and %s do not contain the same number of runs' % (firstfile, secondfile))
+        return False
+    # The per-run comparisons are independent and mostly file I/O,
+    # so compare all the runs concurrently; map preserves the run
+    # order for the reported mismatches
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(compare_clusters, firstruns, secondruns, repeat(verbose)))
+    return all(results)
+
+
+def main():
+    '''
+    Compare all the task outputs of two Lemon-Tree runs.
+    '''
+    args = parse_args()
+    firstconfigs = read_task_outputs(args.first)
+    secondconfigs = read_task_outputs(args.second)
+    if len(firstconfigs) != len(secondconfigs):
+        print('The two runs did not execute the same number of tasks')
+        return False
+    compare_funcs = {
+        'ganesh'          : compare_ganesh,
+        'tight_clusters'  : compare_clusters,
+        'regulators'      : compare_regulators,
+        'module_networks' : compare_modules,
+    }
+    match = True
+    for firsttask, secondtask in zip(firstconfigs, secondconfigs):
+        if compare_configs(firsttask, secondtask):
+            compare = compare_funcs[firsttask['task']]
+            match = compare(os.path.join(args.first, firsttask['output_file']),
+                            os.path.join(args.second, secondtask['output_file']),
+                            args.verbose) and match
+        else:
+            match = False
+        if not (match or args.verbose):
+            # Without -v only the exit status matters; stop at the
+            # first mismatching task instead of comparing the rest
+            return False
+    return match
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(0 if main() else 1)
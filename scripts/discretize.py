@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+##
+# @file discretize.py
+# @brief Script for discretizing continuous expression data sets.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Discretize a continuous data set')
+    parser.add_argument('-f', '--file', metavar='FILE', type=str, required=True,
+                        help='Name of the file from which the data set should be read.')
+    parser.add_argument('-s', '--separator', metavar='CHAR', type=str, default='\t',
+                        help='Delimiting character in the data set file.')
+    parser.add_argument('-c', '--colobs', action='store_true',
+                        help='The data set file contains observations in columns.')
+    parser.add_argument('-v', '--varnames', action='store_true',
+                        help='The data set file contains variable names.')
+    parser.add_argument('-i', '--indices', action='store_true',
+                        help='The data set file contains observation indices.')
+    parser.add_argument('-o', '--output', metavar='FILE', type=str, required=True,
+                        help='Name of the file to which the discretized data set should be written.')
+    parser.add_argument('-z', '--stream', action='store_true',
+                        help='Discretize the data set in fixed-size chunks to bound peak memory.')
+    return parser.parse_args()
+
+
+# Number of file rows read per chunk in streaming mode
+CHUNK_ROWS = 65536
+
+
+def _column_dtypes(name, sep, varnames, indices):
+    '''
+    Build the float32 dtype mapping for the data columns.
+
+    A blanket dtype would also be applied to the string observation
+    index, so the data columns are probed from the first row and typed
+    individually.
+    '''
+    import pandas as pd
+    probe = pd.read_csv(name, sep=sep, header=0 if varnames else None,
+                        index_col=0 if indices else None, nrows=1)
+    return dict((column, np.float32) for column in probe.columns)
+
+
+def read_dataset(name, sep, varnames, indices):
+    '''
+    Read the data set from the given file in its on-disk layout.
+    '''
+    import pandas as pd
+    # float32 is ample precision for binning against mean multiples
+    # and halves the bytes streamed through every later pass
+    return pd.read_csv(name, sep=sep, header=0 if varnames else None,
+                       index_col=0 if indices else None,
+                       dtype=_column_dtypes(name, sep, varnames, indices))
+
+
+def discretize_column(column, control, cmin, cmax):
+    '''
+    Discretize a single column into three levels.
+
+    The bin edges are multiples of the given control value, following
+    the discretization used by Tchourine et al. for RNA-seq data sets,
+    clamped into the column's range so that low-variance columns bin
+    identically on every code path.
+    '''
+    lo = max(control / np.sqrt(2), cmin)
+    hi = min(control * np.sqrt(2), cmax)
+    return discretize_levels(column, lo, hi)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _discretize_matrix(arr, out):
+        n, m = arr.shape
+        for j in prange(m):
+            total = 0.0
+            cmin = arr[0, j]
+            cmax = arr[0, j]
+            for i in range(n):
+                v = arr[i, j]
+                total += v
+                if v < cmin:
+                    cmin = v
+                if v > cmax:
+                    cmax = v
+            mean = total / n
+            # Clamped into the column's range, matching the fallback
+            lo = max(mean * 0.7071067811865475, cmin)
+            hi = min(mean * 1.4142135623730951, cmax)
+            for i in range(n):
+                v = arr[i, j]
+                out[i, j] = 0 if v < lo else (2 if v >= hi else 1)
+
+
+def discretize(dataset, colobs):
+    '''
+    Discretize all the variables of the data set into three levels.
+
+    With numba available, a JIT kernel fuses the mean computation and
+    the binning into one threaded pass over the variables; otherwise
+    the binning runs over the underlying NumPy matrix variable by
+    variable. When observations are in columns the kernel runs on
+    transposed views, so the on-disk layout is kept and no transposed
+    copy of the matrix is ever materialized.
+    '''
+    import pandas as pd
+    arr = dataset.to_numpy(dtype=np.float32, copy=False)
+    # The levels are in {0, 1, 2}, so an int8 output matrix keeps the
+    # write-side memory traffic at one byte per cell
+    out = np.empty(arr.shape, dtype=np.int8)
+    values = arr.T if colobs else arr
+    levels = out.T if colobs else out
+    if njit is not None:
+        _discretize_matrix(values, levels)
+    else:
+        # The three reductions run back to back over the same ndarray
+        # so the matrix stays hot in cache; no per-column pandas dispatch
+        mins = values.min(axis=0)
+        maxs = values.max(axis=0)
+        means = values.mean(axis=0)
+        for j in range(values.shape[1]):
+            levels[:, j] = discretize_column(values[:, j], means[j], mins[j], maxs[j])
+    return pd.DataFrame(out, index=dataset.index, columns=dataset.columns)
+
+
+def discretize_levels(arr, lo, hi):
+    '''
+    Assign the three levels given the per-variable bin edges.
+    '''
+    return np.where(arr < lo, np.int8(0), np.where(arr >= hi, np.int8(2), np.int8(1)))
+
+
+def discretize_streaming(name, sep, colobs, varnames, indices, output):
+    '''
+    Discretize the data set in fixed-size chunks to bound peak memory.
+
+    With observations in columns, every chunk of file rows is a batch
+    of complete variables, so a single pass bins each chunk and
+    appends it to the output in the on-disk layout, with no transpose.
+    With observations in rows, the per-variable bin edges need the
+    whole file, so a first pass over the chunks accumulates the column
+    sums and extremes and a second pass bins and appends.
+    '''
+    import pandas as pd
+    dtypes = _column_dtypes(name, sep, varnames, indices)
+    read_chunks = lambda: pd.read_csv(name, sep=sep, header=0 if varnames else None,
+                                      index_col=0 if indices else None, chunksize=CHUNK_ROWS,
+                                      dtype=dtypes)
+    first = True
+    if colobs:
+        for chunk in read_chunks():
+            arr = chunk.to_numpy(dtype=np.float32, copy=False)
+            means = arr.mean(axis=1, keepdims=True)
+            lo = np.maximum(means / np.sqrt(2), arr.min(axis=1, keepdims=True))
+            hi = np.minimum(means * np.sqrt(2), arr.max(axis=1, keepdims=True))
+            codes = discretize_levels(arr, lo, hi)
+            pd.DataFrame(codes, index=chunk.index, columns=chunk.columns).to_csv(
+                output, sep=sep, header=varnames and first, index=indices,
+                mode='w' if first else 'a')
+            first = False
+    else:
+        sums = 0.0
+        mins = np.inf
+        maxs = -np.inf
+        count = 0
+        for chunk in read_chunks():
+            arr = chunk.to_numpy(dtype=np.float32, copy=False)
+            sums = sums + arr.sum(axis=0)
+            mins = np.minimum(mins, arr.min(axis=0))
+            maxs = np.maximum(maxs, arr.max(axis=0))
+            count += arr.shape[0]
+        means = sums / count
+        lo = np.maximum(means / np.sqrt(2), mins)
+        hi = np.minimum(means * np.sqrt(2), maxs)
+        for chunk in read_chunks():
+            codes = discretize_levels(chunk.to_numpy(dtype=np.float32, copy=False), lo, hi)
+            pd.DataFrame(codes, index=chunk.index, columns=chunk.columns).to_csv(
+                output, sep=sep, header=varnames and first, index=indices,
+                mode='w' if first else 'a')
+            first = False
+
+
+# Number of rows formatted per batch when writing
+WRITE_ROWS = 1024
+
+
+def write_dataset(dataset, name, sep, varnames, indices):
+    '''
+    Write the discretized data set to the given file.
+
+    The data set is already in its on-disk layout, so no transpose is
+    needed on the way out. The levels are small integers, so the rows
+    are formatted in batches with np.char.mod and written through a
+    large buffer, instead of going through pandas' per-cell to_csv
+    formatting.
+    '''
+    arr = dataset.to_numpy(dtype=np.int8, copy=False)
+    index = dataset.index.astype(str).to_numpy() if indices else None
+    with open(name, 'wb', buffering=1 << 20) as f:
+        if varnames:
+            header = sep.join(str(column) for column in dataset.columns)
+            if indices:
+                header = (str(dataset.index.name) if dataset.index.name is not None else '') + sep + header
+            f.write(header.encode('utf-8') + b'\n')
+        for start in range(0, arr.shape[0], WRITE_ROWS):
+            block = np.char.mod('%d', arr[start:start + WRITE_ROWS])
+            if indices:
+                block = np.column_stack([index[start:start + WRITE_ROWS], block])
+            lines = '\n'.join(sep.join(row) for row in block)
+            f.write(lines.encode('utf-8') + b'\n')
+
+
+def main():
+    '''
+    Read, discretize, and write the data set.
+    '''
+    args = parse_args()
+    if args.stream:
+        discretize_streaming(args.file, args.separator, args.colobs, args.varnames,
+                             args.indices, args.output)
+        return
+    dataset = read_dataset(args.file, args.separator, args.varnames, args.indices)
+    discretized = discretize(dataset, args.colobs)
+    write_dataset(discretized, args.output, args.separator, args.varnames, args.indices)
+
+
+if __name__ == '__main__':
+    main()
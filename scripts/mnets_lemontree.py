@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+##
+# @file mnets_lemontree.py
+# @brief Script for running the Lemon-Tree module network pipeline.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+from itertools import chain
+import json
+import os
+import subprocess
+import tempfile
+
+import pandas as pd
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# The pipeline tasks, in execution order
+all_tasks = ('ganesh', 'tight_clusters', 'regulators', 'module_networks')
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Run the Lemon-Tree module network pipeline')
+    parser.add_argument('-f', '--dataset', metavar='FILE', type=str, required=True,
+                        help='Name of the file from which the data set should be read.')
+    parser.add_argument('-s', '--separator', metavar='CHAR', type=str, default='\t',
+                        help='Delimiting character in the data set file.')
+    parser.add_argument('-c', '--colobs', action='store_true',
+                        help='The data set file contains observations in columns.')
+    parser.add_argument('-v', '--varnames', action='store_true',
+                        help='The data set file contains variable names.')
+    parser.add_argument('-i', '--indices', action='store_true',
+                        help='The data set file contains observation indices.')
+    parser.add_argument('-x', '--executable', metavar='FILE', type=str, default='lemon-tree',
+                        help='Path to the executable used for running the tasks.')
+    parser.add_argument('-g', '--configs', metavar='DIR', type=str, required=True,
+                        help='Directory containing the task configuration files.')
+    parser.add_argument('-o', '--output', metavar='DIR', type=str, required=True,
+                        help='Directory to which the task outputs should be written.')
+    parser.add_argument('-r', '--runs', metavar='N', type=int, default=10,
+                        help='Number of GaneSH clustering runs.')
+    return parser.parse_args()
+
+
+def read_task_configs(task, datafile, configdir):
+    '''
+    Read the configurations for the given task.
+    '''
+    with open(os.path.join(configdir, '%s.json' % task), 'rb') as fc:
+        return {'task': task, 'data_file': datafile, **json_loads(fc.read())}
+
+
+def read_dataset(name, sep, colobs, varnames, indices):
+    '''
+    Read the data set from the given file, with variables in rows.
+    '''
+    dataset = pd.read_csv(name, sep=sep, header=0 if varnames else None,
+                          index_col=0 if indices else None)
+    if not colobs:
+        dataset = dataset.T
+    return dataset
+
+
+def write_variables(name, sep, colobs, varnames, indices):
+    '''
+    Write the names of all the variables in the data set to a file.
+
+    Only the variable names are parsed out of the data set file; the
+    numeric data, and the transpose for row observations, are skipped
+    entirely.
+    '''
+    if colobs and indices:
+        # Variables are in rows, with their names in the first column
+        names = pd.read_csv(name, sep=sep, usecols=[0], skiprows=1 if varnames else 0,
+                            header=None, dtype='string')[0]
+    elif not colobs and varnames:
+        # Variables are in columns, with their names in the header row
+        names = pd.read_csv(name, sep=sep, nrows=0, index_col=0 if indices else None).columns
+    else:
+        # Unnamed variables; fall back to the numbered index
+        names = read_dataset(name, sep, colobs, varnames, indices).index
+    variables_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
+    variables_file.write('\n'.join(str(var) for var in names) + '\n')
+    variables_file.close()
+    return variables_file.name
+
+
+def run_task(executable, configs):
+    '''
+    Run a single task of the pipeline with the given configurations.
+    '''
+    arguments = [executable] + list(chain.from_iterable(('-%s' % name, str(value)) for name, value in configs.items()))
+    process = subprocess.Popen(arguments, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = process.communicate()[0].decode('utf-8')
+    if process.returncode != 0:
+        raise RuntimeError('Task %s failed:\n%s' % (configs['task'], output))
+    return output
+
+
+def run_ganesh(executable, configs, num_runs):
+    '''
+    Run the GaneSH clustering the given number of times.
+
+    The output file of the task records the file names of all the
+    individual runs, one per line.
+    '''
+    output_file = configs['output_file']
+    run_files = [f'{output_file}.{r}' for r in range(num_runs)]
+    for r, run_file in enumerate(run_files):
+        run_configs = dict(configs)
+        run_configs['output_file'] = run_file
+        run_configs['seed'] = r
+        run_task(executable, run_configs)
+    with open(output_file, 'w') as of:
+        of.write('\n'.join(run_files) + '\n')
+
+
+def run_lemontree(executable, datafile, configdir, outdir, num_runs, variables_file):
+    '''
+    Run all the pipeline tasks in order and return their configurations.
+    '''
+    all_configs = []
+    prev_output = None
+    for task in all_tasks:
+        configs = read_task_configs(task, datafile, configdir)
+        # The recorded configuration keeps the bare file name; the
+        # comparison joins it onto its own output directory, so the
+        # joined path is only used for running the task
+        output_file = os.path.join(outdir, configs['output_file'])
+        run_configs = dict(configs)
+        run_configs['output_file'] = output_file
+        # The scratch file name is fresh every run, so it goes only
+        # into the run copy and never into the recorded configuration,
+        # which has to match across the runs being compared
+        # Only the name is needed; mkstemp reserves it safely without
+        # the file-object machinery of NamedTemporaryFile
+        fd, scratch_file = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        run_configs['scratch_file'] = scratch_file
+        if task == 'ganesh':
+            run_ganesh(executable, run_configs, num_runs)
+        else:
+            if task == 'tight_clusters':
+                run_configs['cluster_file'] = prev_output
+            elif task == 'regulators':
+                run_configs['cluster_file'] = prev_output
+                run_configs['reg_file'] = variables_file
+            else:
+                run_configs['reg_file'] = prev_output
+            run_task(executable, run_configs)
+        prev_output = output_file
+        all_configs.append(configs)
+    return all_configs
+
+
+def main():
+    '''
+    Run the pipeline and record the task configurations for comparison.
+    '''
+    args = parse_args()
+    variables_file = write_variables(args.dataset, args.separator, args.colobs,
+                                     args.varnames, args.indices)
+    all_configs = run_lemontree(args.executable, args.dataset, args.configs,
+                                args.output, args.runs, variables_file)
+    with open(os.path.join(args.output, 'configs.json'), 'w') as cf:
+        json.dump(all_configs, cf, indent=2)
+    os.remove(variables_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+##
+# @file pbs.py
+# @brief Script for submitting the experiment scripts through PBS.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import os
+from os.path import basename
+import shutil
+import subprocess
+import tempfile
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Submit an experiment script through PBS')
+    parser.add_argument('-s', '--script', metavar='FILE', type=str, required=True,
+                        help='Experiment script to be submitted.')
+    parser.add_argument('-n', '--nodes', metavar='N', type=int, default=1,
+                        help='Number of nodes to be requested.')
+    parser.add_argument('-p', '--procs', metavar='N', type=int, default=None,
+                        help='Number of processors per node to be requested (default: all the cores).')
+    parser.add_argument('-w', '--walltime', metavar='HH:MM:SS', type=str, default='01:00:00',
+                        help='Wall time to be requested for the job.')
+    parser.add_argument('-q', '--queue', metavar='NAME', type=str, default='hive',
+                        help='Queue to which the job should be submitted.')
+    parser.add_argument('-d', '--depend', metavar='JOBID', type=str,
+                        help='Job on whose successful completion this job depends.')
+    parser.add_argument('-v', '--variables', metavar='NAME=VALUE', type=str, nargs='*', default=[],
+                        help='Environment variables to be exported to the job.')
+    return parser.parse_args()
+
+
+def get_preamble(args):
+    '''
+    Build the PBS directive preamble for the job script.
+    '''
+    preamble = []
+    preamble.append('#PBS -N %s' % basename(args.script))
+    preamble.append('#PBS -l nodes=%d:ppn=%d' % (args.nodes, args.procs))
+    preamble.append('#PBS -l walltime=%s' % args.walltime)
+    preamble.append('#PBS -q %s' % args.queue)
+    if args.depend is not None:
+        preamble.append('#PBS -W depend=afterok:%s' % args.depend)
+    if args.variables:
+        preamble.append('#PBS -v %s' % ','.join(args.variables))
+    return '\n'.join(preamble) + '\n'
+
+
+def create_submission_script(script, preamble):
+    '''
+    Create the submission script by splicing the preamble into a copy
+    of the experiment script, after the shebang line if there is one.
+    '''
+    if not os.path.exists(script):
+        raise RuntimeError('Experiment script %s does not exist' % script)
+    pbs = tempfile.NamedTemporaryFile(mode='wb', suffix='.pbs', delete=False)
+    with open(script, 'rb') as orig:
+        # Only the first line needs inspecting for the shebang; the
+        # rest of the script is copied file to file, which goes
+        # through sendfile instead of a read-split-join in Python
+        first = orig.readline()
+        if first.startswith(b'#!'):
+            pbs.write(first)
+        else:
+            orig.seek(0)
+        pbs.write(preamble.encode('utf-8'))
+        shutil.copyfileobj(orig, pbs, length=1 << 16)
+    pbs.close()
+    return pbs.name
+
+
+def main():
+    '''
+    Create the submission script and submit it.
+    '''
+    args = parse_args()
+    if args.procs is None:
+        # Probing the core count can fork a helper on some clusters;
+        # only pay for it when -p was not given
+        import multiprocessing
+        args.procs = multiprocessing.cpu_count()
+    submission = create_submission_script(args.script, get_preamble(args))
+    subprocess.check_call(['qsub', submission])
+    os.remove(submission)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python
+##
+# @file run_experiments.py
+# @brief Script for running the scalability experiments with ramBLe.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import concurrent.futures
+import functools
+import hashlib
+from itertools import product
+import json
+import os
+from os.path import join
+import shlex
+import subprocess
+import sys
+from tempfile import NamedTemporaryFile
+import threading
+
+from _experiment_common import compile_runtime_pattern, order_runtimes
+
+
+# Data sets used in the experiments:
+# name -> (file, n, m, separator, colobs, varnames, indices)
+all_datasets = {
+    'child'       : ('child.csv', 20, 10000, ',', True, False, False),
+    'insurance'   : ('insurance.csv', 27, 10000, ',', True, False, False),
+    'mildew'      : ('mildew.csv', 35, 10000, ',', True, False, False),
+    'alarm'       : ('alarm.csv', 37, 10000, ',', True, False, False),
+    'yeast'       : ('yeast_microarray_expression_discretized.tsv', 5716, 2577, '\t', True, True, True),
+    'development' : ('athaliana_development_discretized.tsv', 18373, 5102, '\t', True, True, True),
+    'complete'    : ('athaliana_complete_discretized.tsv', 18380, 16838, '\t', True, True, True),
+}
+
+# Boolean data set options, in the order of the all_datasets flags
+boolean_args = ['-c', '-v', '-i']
+
+# All the actions timed by the executable, in the order in which they
+# should be recorded in the results file
+all_actions = (
+    'warming up MPI',
+    'reading the file',
+    'redistributing',
+    'getting the blankets',
+    'symmetry correcting the blankets',
+    'synchronizing the blankets',
+    'getting the neighbors',
+    'directing the edges',
+    'G-square computations',
+    'mxx calls',
+    'getting the network',
+    'writing the network',
+)
+
+# Actions which must appear in the output of every run
+required_actions = frozenset(('reading the file', 'getting the network'))
+
+# Matches the run time line of any action, so one scan of the output
+# collects all of them
+_RT_ALL = compile_runtime_pattern(all_actions)
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Run the scalability experiments')
+    parser.add_argument('-a', '--algorithm', metavar='NAME', type=str, nargs='+',
+                        default=['gs', 'iamb', 'inter.iamb'],
+                        help='Algorithms to be used.')
+    parser.add_argument('-d', '--dataset', metavar='NAME', type=str, nargs='+',
+                        default=['yeast'], help='Data sets to be used.')
+    parser.add_argument('-p', '--process', metavar='N', type=int, nargs='+',
+                        default=[16], help='Number of processes to be used.')
+    parser.add_argument('--ppn', metavar='N', type=int, nargs='+',
+                        default=[24], help='Number of processes per node.')
+    parser.add_argument('-r', '--repeat', metavar='N', type=int, default=5,
+                        help='Number of times the experiments should be repeated.')
+    parser.add_argument('-b', '--basedir', metavar='DIR', type=str, default='.',
+                        help='Directory containing the data set files.')
+    parser.add_argument('--scratch', metavar='DIR', type=str, default='.',
+                        help='Scratch directory for hostfiles and learned networks.')
+    parser.add_argument('-x', '--executable', metavar='FILE', type=str, default='./ramble',
+                        help='Path to the executable to be run.')
+    parser.add_argument('--results', metavar='FILE', type=str, default='results.csv',
+                        help='Name of the CSV file to which the results should be written.')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare the learned networks against the expected ones.')
+    parser.add_argument('--cache-dir', metavar='DIR', type=str, default=None,
+                        help='Directory in which the run times of completed runs should be cached.')
+    parser.add_argument('--force', action='store_true',
+                        help='Rerun the experiments even on a cache hit.')
+    parser.add_argument('-j', '--jobs', metavar='N', type=int, default=1,
+                        help='Number of runs to be dispatched concurrently.')
+    parser.add_argument('--weak', metavar='N', type=int, nargs='*', default=[],
+                        help='Variable counts for weak scaling runs.')
+    return parser.parse_args()
+
+
+# Created hostfiles, keyed by the ppn so that reruns within the same
+# job reuse the same file
+_hostfiles = dict()
+
+
+@functools.lru_cache(maxsize=1)
+def _read_nodefile():
+    '''
+    Read the unique hosts from PBS_NODEFILE, in their original order.
+
+    PBS_NODEFILE lists every process slot, so each host appears once
+    per slot; a single dict.fromkeys pass deduplicates the stripped
+    host names. The nodefile does not change within a job, so it is
+    read from disk only once across all the ppn values.
+    '''
+    with open(os.environ['PBS_NODEFILE'], 'r') as nf:
+        return tuple(h for h in dict.fromkeys(line.strip() for line in nf) if h)
+
+
+def get_hostfile(scratch, ppn):
+    '''
+    Create a hostfile with the given processes per node.
+    '''
+    if ppn in _hostfiles:
+        return _hostfiles[ppn]
+    hosts = ['%s:%d' % (h, ppn) for h in _read_nodefile()]
+    hostfile = NamedTemporaryFile(mode='w', suffix='.hosts', dir=scratch, delete=False)
+    hostfile.write('\n'.join(hosts) + '\n')
+    hostfile.close()
+    _hostfiles[ppn] = hostfile.name
+    return hostfile.name
+
+
+def parse_runtimes(found):
+    '''
+    Order the collected run times and check for the required actions.
+    '''
+    return order_runtimes(found, all_actions, required_actions)
+
+
+def get_executable_configurations(executable, datasets, algorithms, basedir):
+    '''
+    Build the executable invocations for the given data sets and algorithms.
+    '''
+    # The dataset-derived arguments are invariant across algorithms,
+    # so build them once per data set instead of once per pair; as
+    # argv lists the separator needs no quoting at all
+    dataset_cache = dict((name, all_datasets[name]) for name in datasets)
+    dataset_argv = dict((name, ['-f', join(basedir, a[0]), '-n', str(a[1]), '-m', str(a[2]), '-s', a[3]]
+                               + [b for b, flag in zip(boolean_args, a[4:]) if flag])
+                        for name, a in dataset_cache.items())
+    return [(name, algorithm, [executable] + dataset_argv[name] + ['-a', algorithm])
+            for name, algorithm in product(datasets, algorithms)]
+
+
+def get_mpi_configurations(scratch, processes, ppns):
+    '''
+    Build the mpirun prefixes for the given process counts.
+
+    The per-ppn hostfiles are written concurrently; the nodefile read
+    behind them is cached, so only the writes actually overlap.
+    '''
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ppns)) as executor:
+        ppn_hostfiles = dict(zip(ppns, executor.map(functools.partial(get_hostfile, scratch), ppns)))
+    configurations = []
+    for p, ppn in product(processes, ppns):
+        configurations.append(((p, ppn), ['mpirun', '-np', str(p), '-hostfile', ppn_hostfiles[ppn]]))
+    return configurations
+
+
+def _truncate_lines(source, destination, count):
+    '''
+    Copy the first count lines of source to destination, moving the
+    bytes in large chunks instead of line by line.
+    '''
+    remaining = count
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        while remaining > 0:
+            chunk = src.read(1 << 22)
+            if not chunk:
+                break
+            found = chunk.count(b'\n')
+            if found < remaining:
+                dst.write(chunk)
+                remaining -= found
+            else:
+                pos = -1
+                for _ in range(remaining):
+                    pos = chunk.index(b'\n', pos + 1)
+                dst.write(chunk[:pos + 1])
+                remaining = 0
+
+
+def get_weak_scaling_datasets(basedir, scratch, datasets, weak):
+    '''
+    Create truncated copies of the data sets for the weak scaling runs.
+
+    The sizes are written largest first. With observations in columns
+    a smaller variable count is a line prefix of a larger one, so the
+    largest copy is cut straight out of the source file and the
+    smaller ones out of the largest copy, without ever parsing the
+    data. Otherwise, the data set is read once and sliced per size.
+    The truncated copies are registered in all_datasets so that the
+    executable configurations can be built for them as usual.
+    '''
+    sizes = sorted(weak, reverse=True)
+    for name in datasets:
+        filename, n, m, sep, colobs, varnames, indices = all_datasets[name]
+        if not colobs:
+            from discretize import read_dataset, write_dataset
+            read = read_dataset(join(basedir, filename), sep, varnames, indices)
+        largest = None
+        for w in sizes:
+            weakfile = '%s_%d.csv' % (name, w)
+            if colobs:
+                source = join(basedir, filename) if largest is None else largest
+                _truncate_lines(source, join(scratch, weakfile), w + (1 if varnames else 0))
+            else:
+                write_dataset(read.iloc[:, :w], join(scratch, weakfile), sep, varnames, indices)
+            if largest is None:
+                largest = join(scratch, weakfile)
+            all_datasets['%s_%d' % (name, w)] = (weakfile, w, m, sep, colobs, varnames, indices)
+    # The pairing with the process counts follows the order given on
+    # the command line, not the write order
+    return ['%s_%d' % (name, w) for name in datasets for w in weak]
+
+
+def run_single(scratch, config, r):
+    '''
+    Launch one run of the given configuration and return the run times
+    collected from its output.
+
+    The output is matched line by line while it is teed, so the whole
+    run log is never held in memory.
+    '''
+    dataset, algorithm, processes, ppn, arguments = config
+    outfile = join(scratch, f'{dataset}_{algorithm}_p{processes}_ppn{ppn}_r{r}.dot')
+    argv = arguments + ['-o', outfile]
+    print(shlex.join(argv))
+    found = dict()
+    with subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1 << 16) as process:
+        for line in process.stdout:
+            text = line.decode('utf-8')
+            sys.stdout.write(text)
+            match = _RT_ALL.search(text)
+            if match is not None:
+                found[match.group(1)] = float(match.group(2))
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, argv)
+    return found
+
+
+def _cache_key(config):
+    '''
+    Content-address a configuration by its argv and the modification
+    times of the files it references.
+
+    The hostfile in the argv is freshly created every job, so it and
+    its timestamp are left out of the key; the ppn it encodes is keyed
+    directly instead, so configurations differing only in the ppn
+    never share an entry.
+    '''
+    dataset, algorithm, processes, ppn, arguments = config
+    tokens = [str(ppn)]
+    skip = False
+    for token in arguments:
+        if skip:
+            skip = False
+            continue
+        if token == '-hostfile':
+            skip = True
+            continue
+        tokens.append(token)
+        if os.path.isfile(token):
+            tokens.append(str(os.stat(token).st_mtime_ns))
+    return hashlib.sha256('\0'.join(tokens).encode('utf-8')).hexdigest()
+
+
+def run_experiment(scratch, config, repeat, cache_dir=None, force=False):
+    '''
+    Run the experiment for the given configuration the given number of
+    times and yield the repeat index and collected run times of every
+    run.
+
+    With a cache directory, previously completed runs of an unchanged
+    configuration are replayed from their cached run times instead of
+    being rerun; the executable or data set file changing invalidates
+    the entry through the key. Every yield carries a flag telling a
+    replayed run from a fresh one, since replays never wrote a network
+    that could be compared.
+    '''
+    cachefile = None
+    if cache_dir is not None:
+        cachefile = join(cache_dir, '%s.json' % _cache_key(config))
+        if not force and os.path.exists(cachefile):
+            with open(cachefile, 'r') as cf:
+                cached = json.load(cf)
+            if len(cached) >= repeat:
+                for r, found in enumerate(cached[:repeat]):
+                    yield r, found, False
+                return
+    runs = []
+    r = 0
+    while r < repeat:
+        found = run_single(scratch, config, r)
+        runs.append(found)
+        yield r, found, True
+        r += 1
+    if cachefile is not None:
+        with open(cachefile, 'w') as cf:
+            json.dump(runs, cf)
+
+
+def record_experiment(scratch, config, r, found, compare, existing):
+    '''
+    Order one run's collected run times, optionally compare the
+    learned network against the expected one, and format the results
+    row.
+
+    The expected networks present in the scratch directory arrive as
+    a set scanned once up front, so no run stats the filesystem.
+    '''
+    dataset, algorithm, processes, ppn, arguments = config
+    comparison = None
+    if compare and '%s.dot' % dataset in existing:
+        # Launch the comparison first and collect it last, so it runs
+        # while the run times are ordered and formatted
+        dotfile = join(scratch, f'{dataset}.dot')
+        outfile = join(scratch, f'{dataset}_{algorithm}_p{processes}_ppn{ppn}_r{r}.dot')
+        comparison = subprocess.Popen(['compare_dot', outfile, dotfile])
+    runtimes = parse_runtimes(found)
+    row = '%s,%s,%d,%s\n' % (dataset, algorithm, processes, ','.join(str(rt) for rt in runtimes))
+    if comparison is not None and comparison.wait() != 0:
+        raise subprocess.CalledProcessError(comparison.returncode, 'compare_dot')
+    return row
+
+
+def run_parallel(scratch, all_configs, repeat, compare, existing, jobs, results, cache_dir, force):
+    '''
+    Run all the (configuration, repeat) pairs on a thread pool.
+
+    Launching and draining the runs releases the GIL, so threads are
+    enough to overlap them; this only helps when the concurrent
+    configurations use disjoint hosts. Every run writes its own
+    learned network file, and the results rows are written out as the
+    runs finish, serialized behind a lock. Cached configurations are
+    replayed up front without occupying the pool and skip the network
+    comparison, since their runs never wrote a network; fresh runs
+    populate the cache once all their repeats complete.
+    '''
+    lock = threading.Lock()
+
+    def run_one(config, r):
+        found = run_single(scratch, config, r)
+        row = record_experiment(scratch, config, r, found, compare, existing)
+        with lock:
+            results.write(row)
+            results.flush()
+        return found
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = []
+        for config in all_configs:
+            cachefile = None
+            if cache_dir is not None:
+                cachefile = join(cache_dir, '%s.json' % _cache_key(config))
+                if not force and os.path.exists(cachefile):
+                    with open(cachefile, 'r') as cf:
+                        cached = json.load(cf)
+                    if len(cached) >= repeat:
+                        # The replay happens on the submission thread
+                        # while earlier configurations' workers write
+                        # their rows, so it takes the same lock
+                        with lock:
+                            for r, found in enumerate(cached[:repeat]):
+                                results.write(record_experiment(scratch, config, r, found, False, existing))
+                            results.flush()
+                        continue
+            pending.append((cachefile, [executor.submit(run_one, config, r) for r in range(repeat)]))
+        for cachefile, runs in pending:
+            all_found = [future.result() for future in runs]
+            if cachefile is not None:
+                with open(cachefile, 'w') as cf:
+                    json.dump(all_found, cf)
+
+
+def main():
+    '''
+    Run all the configured experiments and record the run times.
+    '''
+    args = parse_args()
+    # Resolve the executable path once up front instead of per
+    # configuration build
+    executable = os.path.abspath(args.executable)
+    mpi_configs = get_mpi_configurations(args.scratch, args.process, args.ppn)
+    if args.weak:
+        weak_names = get_weak_scaling_datasets(args.basedir, args.scratch, args.dataset, args.weak)
+        exec_configs = get_executable_configurations(executable, weak_names, args.algorithm, args.scratch)
+        # Pair every mpirun configuration with the executable
+        # configurations of its weak scaling size, cycling through the
+        # sizes in the given order
+        k = len(args.algorithm)
+        per_dataset = [exec_configs[i * k:(i + 1) * k] for i in range(len(exec_configs) // k)]
+        all_configs = [(e[0], e[1], m[0][0], m[0][1], m[1] + e[2])
+                       for i, m in enumerate(mpi_configs)
+                       for e in per_dataset[i % len(per_dataset)]]
+    else:
+        exec_configs = get_executable_configurations(executable, args.dataset, args.algorithm, args.basedir)
+        # Left lazy: each configuration tuple and its argv list are
+        # built only when the sweep reaches it
+        all_configs = ((e[0], e[1], m[0][0], m[0][1], m[1] + e[2])
+                       for e, m in product(exec_configs, mpi_configs))
+    if args.cache_dir is not None:
+        os.makedirs(args.cache_dir, exist_ok=True)
+    # One scan of the scratch directory stands in for a stat per run
+    # when checking for the expected networks
+    existing = set(e.name for e in os.scandir(args.scratch) if e.name.endswith('.dot'))
+    with open(args.results, 'w') as results:
+        results.write('dataset,algorithm,processes,%s\n' % ','.join(all_actions))
+        if args.jobs > 1:
+            run_parallel(args.scratch, all_configs, args.repeat, args.compare, existing,
+                         args.jobs, results, args.cache_dir, args.force)
+            return
+        # With a single job the runs need the whole allocation and
+        # cannot overlap, but parsing and comparing one run's output
+        # can be pipelined with the launch of the next run
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            pending = None
+            for config in all_configs:
+                for r, found, fresh in run_experiment(args.scratch, config, args.repeat,
+                                                      args.cache_dir, args.force):
+                    if pending is not None:
+                        results.write(pending.result())
+                    pending = executor.submit(record_experiment, args.scratch, config, r, found,
+                                              args.compare and fresh, existing)
+                # One write-through per configuration is enough to
+                # keep the results inspectable mid-sweep
+                results.flush()
+            if pending is not None:
+                results.write(pending.result())
+                results.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+##
+# @file visualize.py
+# @brief Script for visualizing learned networks.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import os
+import subprocess
+import tempfile
+
+
+def parse_args():
+    '''
+    Parse command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Visualize learned networks')
+    parser.add_argument('-f', '--file', metavar='FILE', type=str, nargs='+', required=True,
+                        help='Name of the network file(s) to be visualized.')
+    parser.add_argument('-t', '--format', metavar='FORMAT', type=str, default='dot',
+                        help='Format of the network files (dot or el).')
+    return parser.parse_args()
+
+
+def render_png(name, image):
+    '''
+    Render a dot file to a PNG image with a direct dot invocation.
+    '''
+    subprocess.check_call(['dot', '-Tpng', '-Gdpi=150', '-o', image, name])
+
+
+def view_pipe(name):
+    '''
+    Pipe a dot rendering straight into the viewer.
+
+    The PNG bytes flow from dot's stdout to the viewer's stdin, so no
+    temporary image ever touches the disk.
+    '''
+    dot = subprocess.Popen(['dot', '-Tpng', '-Gdpi=150', name], stdout=subprocess.PIPE)
+    subprocess.check_call(['display', '-'], stdin=dot.stdout)
+    dot.stdout.close()
+    if dot.wait() != 0:
+        raise subprocess.CalledProcessError(dot.returncode, ['dot', name])
+
+
+def render(name, file_format):
+    '''
+    Render the network in the given file to a PNG image.
+
+    A dot file goes straight to dot; parsing it with pydot only to
+    serialize it back for the same dot invocation would double the
+    work, which dominates for the larger networks.
+    '''
+    image = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
+    image.close()
+    if file_format == 'dot':
+        render_png(name, image.name)
+    elif file_format == 'el':
+        import pydot
+        graph = pydot.Dot(graph_type='digraph')
+        with open(name, 'r') as f:
+            for line in f:
+                source, destination = line.split()
+                graph.add_edge(pydot.Edge(source, destination))
+        graph.write_png(image.name)
+    else:
+        raise RuntimeError('Unknown file format %s' % file_format)
+    return image.name
+
+
+def visualize_many(files, file_format):
+    '''
+    Render all the given networks and view them with a single viewer.
+
+    Rendering everything up front means the viewer is launched once
+    for the whole batch instead of once per network. A single dot
+    file skips the temporary images entirely and is piped into the
+    viewer directly.
+    '''
+    if file_format == 'dot' and len(files) == 1:
+        view_pipe(files[0])
+        return
+    images = [render(name, file_format) for name in files]
+    subprocess.check_call(['display'] + images)
+    for image in images:
+        os.remove(image)
+
+
+def main():
+    '''
+    Visualize all the given networks.
+    '''
+    args = parse_args()
+    visualize_many(args.file, args.format)
+
+
+if __name__ == '__main__':
+    main()
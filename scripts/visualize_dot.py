@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+##
+# @file visualize_dot.py
+# @brief Script for quickly viewing networks in dot files.
+# @author Ankit Srivastava <asrivast@gatech.edu>
+#
+# Copyright 2020 Georgia Institute of Technology
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import subprocess
+import sys
+
+
+def visualize_dot(files):
+    '''
+    Render all the given dot files with a single dot invocation and
+    view the images with a single viewer. A single dot file is piped
+    into the viewer directly, with no image file on disk.
+    '''
+    if len(files) == 1:
+        from visualize import view_pipe
+        view_pipe(files[0])
+        return
+    subprocess.check_call(['dot', '-Tpng', '-Gdpi=150', '-O'] + list(files))
+    images = ['%s.png' % name for name in files]
+    subprocess.check_call(['display'] + images)
+    for image in images:
+        os.remove(image)
+
+
+def main():
+    '''
+    View the networks in all the given dot files.
+    '''
+    if len(sys.argv) < 2:
+        sys.exit('Usage: %s <dotfile> [<dotfile> ...]' % sys.argv[0])
+    visualize_dot(sys.argv[1:])
+
+
+if __name__ == '__main__':
+    main()